@@ -1,114 +1,111 @@
 import subprocess
-import tempfile
-import shutil
-import re
 import math
+import tempfile
 from pathlib import Path
 from typing import Dict, Optional
 
+import numpy as np
+
+from gai import get_audio_info
+
+# s16le full scale and read size for the decoded stereo stream (whole 4-byte frames)
+_PCM_FULL_SCALE = 32768.0
+_PCM_CHUNK_BYTES = 1 << 20
+
 def analyze_phase(file_path: str,
                   ffmpeg_cmd: str = "ffmpeg",
-                  side_threshold: float = 0.20) -> Dict[str, Optional[object]]:
+                  side_threshold: float = 0.20,
+                  sample_seconds: Optional[float] = 30.0,
+                  sample_offset: Optional[float] = None) -> Dict[str, Optional[object]]:
     """
     Analyze a stereo file for mid/side energy and recommend whether to use --no-phase-inv.
 
+    Only sample_seconds of audio are decoded, starting at sample_offset (default: a window
+    centred on the middle of the file). Pass sample_seconds=None to analyze the whole file;
+    files shorter than the window, or of unknown duration, are always analyzed in full.
+
     Returns a dict with keys:
       - file: input path
-      - mid_db: mean_volume (dB) of mid channel (float)
-      - side_db: mean_volume (dB) of side channel (float)
+      - mid_db: mean power (dBFS) of mid channel (float)
+      - side_db: mean power (dBFS) of side channel (float)
       - side_pct: fraction of energy in side (0.0-1.0)
       - side_pct_percent: formatted percent string (e.g., "12.3%")
-      - correlation: numeric correlation if found (float) or None
+      - correlation: L/R correlation coefficient (float) or None for silent/constant input
       - recommendation: "use --no-phase-inv" or "allow phase inversion"
       - error: error message if something failed (None on success)
 
-    Requires ffmpeg available on PATH.
+    Requires ffmpeg available on PATH and numpy.
     """
-    tmpdir = tempfile.mkdtemp(prefix="ms_analyze_")
     try:
         src_path = Path(file_path).resolve()
-        temp_input = Path(tmpdir) / "input_src.wav"
-        mid_path = Path(tmpdir) / "mid.wav"
-        side_path = Path(tmpdir) / "side.wav"
-
-        shutil.copy2(src_path, temp_input)
-
-        # 1) create mid and side mono files
-        cmd_pan = [
-            ffmpeg_cmd, "-hide_banner", "-loglevel", "error", "-y",
-            "-i", str(temp_input),
-            "-filter_complex",
-            "[0:a]pan=mono|c0=0.5*c0+0.5*c1[mid];[0:a]pan=mono|c0=0.5*c0-0.5*c1[side]",
-            "-map", "[mid]", str(mid_path),
-            "-map", "[side]", str(side_path)
+
+        # 1) single decode to raw stereo PCM; accumulate the L/R moments chunk by chunk
+        window = []
+        if sample_seconds is not None:
+            if sample_offset is None:
+                duration = _duration_seconds(str(src_path))
+                if duration > sample_seconds:
+                    sample_offset = duration / 2 - sample_seconds / 2
+            if sample_offset is not None:
+                # input-side -ss seeks in the demuxer instead of decoding up to the offset
+                window = ["-ss", f"{sample_offset:.3f}", "-t", f"{sample_seconds:.3f}"]
+        cmd = [
+            ffmpeg_cmd, "-hide_banner", "-nostats", "-loglevel", "error",
+            *window, "-i", str(src_path),
+            "-map", "0:a:0", "-ac", "2", "-f", "s16le", "-acodec", "pcm_s16le", "-"
         ]
-        subprocess.run(cmd_pan, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding="utf-8", errors="replace")
-
-        # helper to run volumedetect and extract mean_volume
-        def mean_volume(path: Path) -> Optional[float]:
-            cmd = [ffmpeg_cmd, "-hide_banner", "-nostats", "-y", "-i", str(path), "-af", "volumedetect", "-f", "null", "-"]
-            proc = subprocess.run(
-                cmd, 
-                check=False, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
-                text=True, 
-                encoding="utf-8", 
-                errors="replace"
-            )
-            out = proc.stderr + proc.stdout
-            # common volumedetect line: "mean_volume: -21.0 dB"
-            m = re.search(r"mean_volume\s*[:=]?\s*([-+]?\d+(?:\.\d+)?)\s*dB", out, re.IGNORECASE)
-            if m:
-                try:
-                    return float(m.group(1))
-                except ValueError:
-                    return None
-            # fallback: try to find "mean_volume" with any numeric token
-            m2 = re.search(r"mean_volume.*?([-+]?\d+(?:\.\d+)?)", out, re.IGNORECASE)
-            if m2:
-                try:
-                    return float(m2.group(1))
-                except ValueError:
-                    return None
-            return None
-
-        mid_db = mean_volume(mid_path)
-        side_db = mean_volume(side_path)
-
-        if mid_db is None or side_db is None:
+        n = 0
+        sum_l = sum_r = sum_ll = sum_rr = sum_lr = 0.0
+        # stderr goes to a temp file, not a pipe: a damaged input logs one line per bad
+        # packet, and an undrained stderr pipe would stall ffmpeg while we block on stdout
+        with tempfile.TemporaryFile() as errfile, \
+                subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errfile) as proc:
+            while True:
+                buf = proc.stdout.read(_PCM_CHUNK_BYTES)
+                if not buf:
+                    break
+                frames = len(buf) // 4
+                pcm = np.frombuffer(buf, dtype="<i2", count=2 * frames).reshape(frames, 2).astype(np.float64)
+                left, right = pcm[:, 0], pcm[:, 1]
+                n += pcm.shape[0]
+                sum_l += float(left.sum())
+                sum_r += float(right.sum())
+                sum_ll += float(left.dot(left))
+                sum_rr += float(right.dot(right))
+                sum_lr += float(left.dot(right))
+            proc.wait()
+            errfile.seek(0)
+            stderr = errfile.read()
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+
+        if n == 0:
             return {
                 "file": file_path,
-                "mid_db": mid_db,
-                "side_db": side_db,
+                "mid_db": None,
+                "side_db": None,
                 "side_pct": None,
                 "side_pct_percent": None,
                 "correlation": None,
                 "recommendation": None,
-                "error": "Failed to extract mean_volume from ffmpeg volumedetect output."
+                "error": "ffmpeg decoded no audio samples."
             }
 
-        # 2) compute side percent (linear energy share)
-        mid_lin = 10 ** (mid_db / 10.0)
-        side_lin = 10 ** (side_db / 10.0)
-        side_pct = side_lin / (mid_lin + side_lin) if (mid_lin + side_lin) > 0 else 0.0
+        # 2) mid/side power from the moments: (L +/- R)/2 squared, relative to full scale
+        scale = n * _PCM_FULL_SCALE * _PCM_FULL_SCALE
+        mid_pow = 0.25 * (sum_ll + 2.0 * sum_lr + sum_rr) / scale
+        side_pow = 0.25 * (sum_ll - 2.0 * sum_lr + sum_rr) / scale
+        mid_db = 10.0 * math.log10(mid_pow + 1e-10)
+        side_db = 10.0 * math.log10(max(side_pow, 0.0) + 1e-10)
+        side_pct = side_pow / (mid_pow + side_pow) if (mid_pow + side_pow) > 0 else 0.0
         side_pct_percent = f"{100 * side_pct:.1f}%"
 
-        # 3) try to extract correlation via astats (optional)
+        # 3) Pearson correlation of L/R (undefined when a channel is constant)
         corr = None
-        try:
-            cmd_astats = [
-                ffmpeg_cmd, "-hide_banner", "-nostats", "-y", "-i", str(temp_input),
-                "-af", "astats=measure_perchannel=1:reset=0", "-f", "null", "-"
-            ]
-            proc = subprocess.run(cmd_astats, check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding="utf-8", errors="replace")
-            out = proc.stderr + proc.stdout
-            # look for "Overall.Correlation: <num>" or "Correlation: <num>"
-            m_corr = re.search(r"(?:Overall\.)?Correlation\s*[:=]?\s*([-+]?\d+(?:\.\d+)?)", out, re.IGNORECASE)
-            if m_corr:
-                corr = float(m_corr.group(1))
-        except Exception:
-            corr = None
+        var_l = sum_ll / n - (sum_l / n) ** 2
+        var_r = sum_rr / n - (sum_r / n) ** 2
+        if var_l > 0 and var_r > 0:
+            corr = (sum_lr / n - (sum_l / n) * (sum_r / n)) / math.sqrt(var_l * var_r)
 
         # 4) recommendation logic
         recommend_no_phase = False
@@ -141,8 +138,13 @@ def analyze_phase(file_path: str,
             "recommendation": None,
             "error": f"ffmpeg failed: {e}"
         }
-    finally:
-        shutil.rmtree(tmpdir, ignore_errors=True)
+
+def _duration_seconds(path: str) -> float:
+    """Duration from the (cached) ffprobe metadata, or 0.0 if it cannot be probed."""
+    try:
+        return float(get_audio_info(path)["length"] or 0.0)
+    except Exception:
+        return 0.0
 
 def isnophaseinv(file_path: str, Verbose: bool = False):
     """
@@ -3,99 +3,117 @@ import json
 import sys
 import os
 import shutil
-from pathlib import Path
+import functools
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Extension mapping
+EXT_MAP = {
+    'opus': 'opus', 'vorbis': 'ogg', 'aac': 'm4a', 
+    'mp3': 'mp3', 'flac': 'flac', 'alac': 'm4a', 
+    'pcm_s16le': 'wav', 'pcm_s24le': 'wav', 'ac3': 'ac3', 'dts': 'dts'
+}
+
+@functools.lru_cache(maxsize=None)
+def _which(name):
+    """shutil.which, resolved once per binary name."""
+    return shutil.which(name)
 
 def check_dependencies():
     """Ensure required binaries are in the PATH."""
     deps = ['ffmpeg', 'ffprobe', 'opustags']
-    missing = [d for d in deps if shutil.which(d) is None]
+    missing = [d for d in deps if _which(d) is None]
     if missing:
         # opustags is only strictly needed for opus; we check here for simplicity
         print(f"Error: Missing dependencies: {', '.join(missing)}")
         sys.exit(1)
 
+def _grab_cover(src_path, cover_path, duration):
+    """Write an I-frame from 10:00 (or 1:00) of src_path to cover_path. Returns True if one was written."""
+    # 10:00 can still come up empty just past ten minutes (no I-frame after the seek),
+    # so fall back to 1:00 like the original two-try loop
+    timestamps = ["00:10:00", "00:01:00"] if duration > 600 else ["00:01:00"]
+    for timestamp in timestamps:
+        subprocess.run([
+            'ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error', '-y', '-ss', timestamp, '-i', src_path,
+            '-vf', r"select=eq(pict_type\,I)", '-vframes', '1', cover_path
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if os.path.exists(cover_path) and os.path.getsize(cover_path) > 0:
+            return True
+    return False
+
 def extract_audio(input_file):
-    src_path = Path(input_file).resolve()
+    src_path = os.path.realpath(input_file)
     
-    if not src_path.exists():
+    if not os.path.exists(src_path):
         print(f"Error: File {src_path} not found.")
         return
 
+    # unique per job, so concurrent batch jobs never share a cover file
+    fd, cover_path = tempfile.mkstemp(prefix='cover_', suffix='.png', dir=os.path.dirname(src_path))
+    os.close(fd)
     try:
         # 1. Get stream info
-        cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', str(src_path)]
+        cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', '-show_format', src_path]
         result = subprocess.check_output(cmd)
         info = json.loads(result)
+        # output names are built from the source path minus its extension
+        src_base = os.path.splitext(src_path)[0]
+        duration = float(info.get('format', {}).get('duration') or 0)
+        # grabbed once, the first time an m4a/opus track needs it
+        has_cover = None
         
         audio_count = 0
         for stream in info.get('streams', []):
             if stream['codec_type'] == 'audio':
                 codec = stream['codec_name']
-                
-                # Extension mapping
-                ext_map = {
-                    'opus': 'opus', 'vorbis': 'ogg', 'aac': 'm4a', 
-                    'mp3': 'mp3', 'flac': 'flac', 'alac': 'm4a', 
-                    'pcm_s16le': 'wav', 'pcm_s24le': 'wav', 'ac3': 'ac3', 'dts': 'dts'
-                }
-                ext = ext_map.get(codec, 'mka')
+                ext = EXT_MAP.get(codec, 'mka')
                 
                 suffix = f"_track{audio_count}" if audio_count > 0 else ""
-                output_name = f"{src_path.stem}{suffix}.{ext}"
-                output_path = src_path.parent / output_name
-                cover_path = src_path.parent / f"{src_path.stem}_cover.png"
+                output_path = f"{src_base}{suffix}.{ext}"
 
                 print(f"--- Processing Track {audio_count}: {codec} ---")
 
-                # 2. Extract Audio (Normal behavior for most formats)
-                if ext not in ['m4a', 'opus']:
+                if ext in ['m4a', 'opus'] and has_cover is None:
+                    has_cover = _grab_cover(src_path, cover_path, duration)
+                    if not has_cover:
+                        print("No cover frame found; extracting audio without a cover.")
+
+                # 2. Extract Audio (Normal behavior for most formats, or no cover to attach)
+                if ext not in ['m4a', 'opus'] or not has_cover:
                     subprocess.run([
-                        'ffmpeg', '-hide_banner', '-y', '-i', str(src_path),
-                        '-map', f'0:a:{audio_count}', '-vn', '-c:a', 'copy', str(output_path)
+                        'ffmpeg', '-nostdin', '-hide_banner', '-y', '-i', src_path,
+                        '-map', f'0:a:{audio_count}', '-vn', '-c:a', 'copy', output_path
                     ], check=True)
                 
-                else:
-                    # 3. Handle Cover Extraction (Only for M4A/Opus)
-                    # Try extracting at 10:00, then 1:00 if that's too far
-                    for timestamp in ["00:10:00", "00:01:00"]:
-                        subprocess.run([
-                            'ffmpeg', '-hide_banner', '-y', '-ss', timestamp, '-i', str(src_path),
-                            '-vf', r"select=eq(pict_type\,I)", '-vframes', '1', str(cover_path)
-                        ], capture_output=True)
-                        if cover_path.exists() and cover_path.stat().st_size > 0:
-                            break
-
-                    # 4. M4A Specific: Extract and attach cover in one go
-                    if ext == 'm4a':
-                        print("Applying cover to M4A...")
-                        subprocess.run([
-                            'ffmpeg', '-hide_banner', '-y', '-i', str(src_path), '-i', str(cover_path),
-                            '-map', f'0:a:{audio_count}', '-map', '1', '-c', 'copy',
-                            '-disposition:v:0', 'attached_pic', '-movflags', '+faststart', str(output_path)
-                        ], check=True)
-
-                    # 5. Opus Specific: Extract audio then use opustags
-                    elif ext == 'opus':
-                        print("Applying cover to Opus via opustags...")
-                        # Extract temp audio first
-                        temp_opus = src_path.parent / f"temp_{output_name}"
-                        subprocess.run([
-                            'ffmpeg', '-hide_banner', '-y', '-i', str(src_path),
-                            '-map', f'0:a:{audio_count}', '-vn', '-c:a', 'copy', str(temp_opus)
-                        ], check=True)
-                        
-                        # Apply tags
-                        subprocess.run([
-                            'opustags', '--set-cover', str(cover_path), str(temp_opus), '-o', str(output_path)
-                        ], check=True)
-                        
-                        if temp_opus.exists():
-                            os.remove(temp_opus)
-
-                # Clean up cover image after track is done
-                if cover_path.exists():
-                    os.remove(cover_path)
-                
+                # 3. M4A Specific: Copy the audio and attach the cover in one go
+                elif ext == 'm4a':
+                    print("Applying cover to M4A...")
+                    subprocess.run([
+                        'ffmpeg', '-nostdin', '-hide_banner', '-y', '-i', src_path, '-i', cover_path,
+                        '-map', f'0:a:{audio_count}', '-map', '1', '-c', 'copy',
+                        '-disposition:v:0', 'attached_pic', '-movflags', '+faststart', output_path
+                    ], check=True)
+
+                # 4. Opus Specific: Pipe the audio straight into opustags
+                elif ext == 'opus':
+                    print("Applying cover to Opus via opustags...")
+                    cmd_audio = [
+                        'ffmpeg', '-nostdin', '-hide_banner', '-y', '-i', src_path,
+                        '-map', f'0:a:{audio_count}', '-vn', '-c:a', 'copy', '-f', 'ogg', 'pipe:1'
+                    ]
+                    cmd_tags = ['opustags', '--set-cover', cover_path, '-', '-o', output_path]
+                    audio_proc = subprocess.Popen(cmd_audio, stdout=subprocess.PIPE)
+                    tags_proc = subprocess.Popen(cmd_tags, stdin=audio_proc.stdout)
+                    # let ffmpeg see SIGPIPE if opustags exits early
+                    audio_proc.stdout.close()
+                    tags_proc.wait()
+                    audio_proc.wait()
+                    if audio_proc.returncode != 0:
+                        raise subprocess.CalledProcessError(audio_proc.returncode, cmd_audio)
+                    if tags_proc.returncode != 0:
+                        raise subprocess.CalledProcessError(tags_proc.returncode, cmd_tags)
+
                 audio_count += 1
                 
         if audio_count == 0:
@@ -105,11 +123,33 @@ def extract_audio(input_file):
         print(f"FFmpeg/Opustags error: {e}")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
+    finally:
+        os.remove(cover_path)
+
+def batch_extract(paths, max_workers=None):
+    """Run extract_audio over several files concurrently.
+
+    The work happens in ffmpeg/opustags child processes, so threads are enough
+    to keep one pipeline per core busy.
+    """
+    # inputs differing only in extension (clip.mp4, clip.mkv) would write the same outputs
+    bases = {}
+    for path in paths:
+        bases.setdefault(os.path.splitext(os.path.realpath(path))[0], []).append(path)
+    clashes = [group for group in bases.values() if len(group) > 1]
+    if clashes:
+        for group in clashes:
+            print(f"Error: {', '.join(group)} would write the same output files.")
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        list(pool.map(extract_audio, paths))
 
 if __name__ == "__main__":
     check_dependencies()
     if len(sys.argv) < 2:
-        print("Usage: python extract_audio.py <video_file>")
-    else:
-
+        print("Usage: python extract_audio.py <video_file> [<video_file> ...]")
+    elif len(sys.argv) == 2:
         extract_audio(sys.argv[1])
+    else:
+        batch_extract(sys.argv[1:])
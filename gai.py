@@ -1,30 +1,62 @@
 import os
+import json
 import subprocess
-from pymediainfo import MediaInfo
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# numeric get_audio_info fields and their dtypes in get_audio_info_batch; the rest stay object arrays
+_BATCH_DTYPES = {
+    "file_size": np.int64,
+    "bitrate": np.int64,
+    "length": np.float64,
+    "sample_rate": np.int32,
+    "base_sample_rate": np.int32,
+    "bit_depth": np.int16,
+    "channels": np.int16,
+}
+# the remaining get_audio_info fields, kept as object columns
+_BATCH_TEXT_FIELDS = ("size_mb", "kbps", "codec", "bitrate_mode", "ext", "path_wo_ext")
 
 def get_audio_info(input_file, o=False):
-    media_info = MediaInfo.parse(input_file)
-    audio_track = next((t for t in media_info.tracks if t.track_type == "Audio"), None)
-    general_track = next((t for t in media_info.tracks if t.track_type == "General"), None)
+    # cache is keyed on size/mtime so a rewritten file is parsed again
+    st = os.stat(input_file)
+    info = dict(_get_audio_info_cached(input_file, st.st_size, st.st_mtime_ns))
+
+    if o:
+        print(f"--- Metadata for: {input_file} ---")
+        for key, value in info.items():
+            print(f"{key}: {value}")
+
+    return info
+
+@functools.lru_cache(maxsize=256)
+def _get_audio_info_cached(input_file, size, mtime_ns):
+    cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', '-show_format', input_file]
+    probe = json.loads(subprocess.check_output(cmd))
+    audio_stream = next((s for s in probe.get('streams', []) if s.get('codec_type') == 'audio'), None)
+    fmt = probe.get('format', {})
 
-    if not audio_track:
+    if not audio_stream:
         raise ValueError("No audio track found")
       
     path_wo_ext, ext = get_path_without_ext(input_file)
-    file_size_bytes = int(general_track.file_size) if general_track and general_track.file_size else 0
+    file_size_bytes = int(fmt.get('size') or 0)
 
-    duration_ms = float(audio_track.duration) if audio_track.duration else 0
-    duration_secs = duration_ms / 1000
+    duration_secs = float(audio_stream.get('duration') or fmt.get('duration') or 0)
 
-    stream_size = audio_track.stream_size or (general_track.file_size if general_track else None)
-    if stream_size and duration_secs > 0:
-        calc_bitrate = int((int(stream_size) * 8) / duration_secs)
+    # ffprobe has no per-stream size; prefer the stream bit rate, then the file average
+    if audio_stream.get('bit_rate'):
+        calc_bitrate = int(audio_stream['bit_rate'])
+    elif file_size_bytes and duration_secs > 0:
+        calc_bitrate = int((file_size_bytes * 8) / duration_secs)
     else:
-        calc_bitrate = int(audio_track.bit_rate) if audio_track.bit_rate else None
+        calc_bitrate = int(fmt['bit_rate']) if fmt.get('bit_rate') else None
       
-    sample_rate_value = int(audio_track.sampling_rate) if audio_track.sampling_rate else 48000
+    sample_rate_value = int(audio_stream.get('sample_rate') or 48000)
     base_sample_rate = get_base_sample_rate(sample_rate_value)
-    bit_depth_value = int(16) if audio_track.compression_mode == "Lossy" else int(audio_track.bit_depth or audio_track.bit_resolution or 16)
+    # lossy codecs report no bit depth, which falls through to 16
+    bit_depth_value = int(audio_stream.get('bits_per_raw_sample') or 0) or int(audio_stream.get('bits_per_sample') or 0) or 16
 
     info = {
         "file_size": file_size_bytes,
@@ -32,23 +64,37 @@ def get_audio_info(input_file, o=False):
         "bitrate": calc_bitrate,
         "kbps": f"{round(calc_bitrate / 1000)}kbps" if calc_bitrate else "N/A",
         "length": duration_secs,
-        "codec": audio_track.format,
+        "codec": audio_stream.get('codec_name'),
         "sample_rate": sample_rate_value,
         "base_sample_rate": base_sample_rate,
         "bit_depth": bit_depth_value,
-        "channels": int(audio_track.channel_s) if audio_track.channel_s else 2,
-        "bitrate_mode": audio_track.bit_rate_mode,
+        "channels": int(audio_stream.get('channels') or 2),
+        "bitrate_mode": None,
         "ext": ext,
         "path_wo_ext": path_wo_ext
     }
 
-    if o:
-        print(f"--- Metadata for: {input_file} ---")
-        for key, value in info.items():
-            print(f"{key}: {value}")
-          
     return info
 
+def get_audio_info_batch(paths):
+    """Return (paths, columns) with one numpy array per get_audio_info field.
+
+    Numeric fields get typed arrays (a missing bitrate becomes 0), so selections
+    like paths[columns["bitrate"] > 320000] are a single vectorized comparison.
+    """
+    paths = np.asarray(list(paths), dtype=object)
+    # fixed field list, so an empty batch still gets (zero-length) columns
+    columns = {key: np.empty(len(paths), dtype=dtype) for key, dtype in _BATCH_DTYPES.items()}
+    columns.update((key, np.empty(len(paths), dtype=object)) for key in _BATCH_TEXT_FIELDS)
+    for i, path in enumerate(paths):
+        st = os.stat(path)
+        info = _get_audio_info_cached(path, st.st_size, st.st_mtime_ns)
+        for key, value in info.items():
+            if key in _BATCH_DTYPES and value is None:
+                value = 0
+            columns[key][i] = value
+    return paths, columns
+
 def get_filename(path):
     filename_with_ext = os.path.basename(path)
     filename, ext = os.path.splitext(filename_with_ext)
@@ -60,11 +106,21 @@ def get_path_without_ext(path):
     return os.path.join(dir_path, filename), ext
 
 def verify(input_file):
-    result = subprocess.run(['flac', '-t', input_file], capture_output=True)
-    if result.returncode == 0:
-        print(f'Successfully encoded and verified: {input_file}')
+    # accepts one path or an iterable of paths; flac -t runs are overlapped in threads
+    if isinstance(input_file, (str, bytes, os.PathLike)):
+        paths = [input_file]
     else:
-        print(f'Failed to verify: {input_file}')
+        paths = list(input_file)
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        returncodes = list(pool.map(_flac_test, paths))
+    for path, returncode in zip(paths, returncodes):
+        if returncode == 0:
+            print(f'Successfully encoded and verified: {path}')
+        else:
+            print(f'Failed to verify: {path}')
+
+def _flac_test(input_file):
+    return subprocess.run(['flac', '-t', input_file], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
 
 def get_base_sample_rate(rate: int) -> int:
     if rate < 44100:
@@ -4,30 +4,77 @@ Extract audio from a video, pick a non-solid frame at 10% of duration,
 and embed that image as cover art into the extracted audio (M4A/Opus).
 Requires: av, mutagen, pillow, numpy
 Install: pip install av mutagen pillow numpy
+(pillow-simd can replace pillow as a drop-in for faster cover resizing on x86)
 """
 
 import sys
 import os
-import av
 import base64
+import functools
+import itertools
 from pathlib import Path
 from io import BytesIO
-from PIL import Image
-import numpy as np
-from mutagen.mp4 import MP4, MP4Cover
-from mutagen.oggopus import OggOpus
-from mutagen.flac import Picture
+
+# av, numpy, PIL and mutagen are imported inside the functions that use them,
+# so the CLI starts (and rejects bad arguments) without loading FFmpeg or numpy.
+
+# -------------------------
+# Input container
+# -------------------------
+# hardware decoders worth trying, in order of preference
+HWACCEL_DEVICES = ("videotoolbox", "cuda", "d3d11va", "dxva2", "vaapi", "qsv")
+
+def _hwaccels():
+    """HWAccel for each device type compiled into FFmpeg, in HWACCEL_DEVICES order.
+
+    Compiled in is not the same as present: the caller has to try each one. Yields
+    nothing if there are none or PyAV is older than 14.
+    """
+    try:
+        from av.codec.hwaccel import HWAccel, hwdevices_available
+        available = set(hwdevices_available())
+    except Exception:
+        return
+    for device in HWACCEL_DEVICES:
+        if device in available:
+            # codecs the device cannot handle are decoded in software instead
+            yield HWAccel(device_type=device, allow_software_fallback=True)
+
+def open_video(path, hwaccel=True):
+    """Open path as a PyAV input container; one container can serve every step below.
+
+    With hwaccel, video is decoded on the first hardware device that opens, falling
+    back to software; decoded frames are copied back to system memory, so
+    to_ndarray() works unchanged. Audio is only remuxed and is unaffected.
+    """
+    import av
+
+    if hwaccel:
+        for accel in _hwaccels():
+            try:
+                return av.open(path, hwaccel=accel)
+            except Exception:
+                continue
+    return av.open(path)
 
 # -------------------------
 # Audio extraction (remux)
 # -------------------------
-def extract_audio_pure_python(input_path, output_folder="."):
-    """Remux first audio stream from input_video into an output file and return its path."""
+def extract_audio_pure_python(input_path, output_folder=".", container=None):
+    """Remux first audio stream from input_video into an output file and return its path.
+
+    Pass an already-open container (see open_video) to skip re-probing the input;
+    it is left open for the caller.
+    """
+    import av
+
     src_path = Path(input_path).resolve()
     if not os.path.isfile(src_path):
         raise FileNotFoundError(f"Input not found: {src_path}")
 
-    container = av.open(src_path)
+    owns_container = container is None
+    if owns_container:
+        container = open_video(src_path)
     try:
         audio_stream = next((s for s in container.streams if s.type == "audio"), None)
         if audio_stream is None:
@@ -72,38 +119,68 @@ def extract_audio_pure_python(input_path, output_folder="."):
         finally:
             out_container.close()
     finally:
-        container.close()
+        if owns_container:
+            container.close()
 
     return output_path
 
 # -------------------------
 # Frame extraction + solid check
 # -------------------------
-def is_solid_color_image(pil_img, tolerance=5, unique_color_threshold=10):
-    arr = np.asarray(pil_img.convert("RGB"))
-    h, w = arr.shape[:2]
-    sample = arr
-    if h * w > 500_000:
-        sample = arr[::4, ::4]
-    unique_colors = np.unique(sample.reshape(-1, 3), axis=0)
-    if unique_colors.shape[0] <= unique_color_threshold:
+def is_solid_color_image(img, tolerance=5, unique_color_threshold=10):
+    """img is a PIL image or an HxWx3 uint8 RGB array (e.g. frame.to_ndarray(format="rgb24"))."""
+    import numpy as np
+
+    if isinstance(img, np.ndarray):
+        # large arrays: every 4th pixel each way (a view, nothing is copied until the reshape)
+        sample = img[::4, ::4] if img.shape[0] * img.shape[1] > 500_000 else img
+    else:
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        # 8x box downsample in PIL's C code; all checks below run on the small image
+        sample = np.asarray(img.reduce(8), dtype=np.uint8)
+    return _is_solid_arr(sample.reshape(-1, 3), tolerance, unique_color_threshold)
+
+def _is_solid_arr(sample, tolerance, unique_color_threshold):
+    """Solidity checks on an Nx3 uint8 pixel sample."""
+    import numpy as np
+
+    if np.ptp(sample, axis=0).max() <= tolerance:
         return True
-    stds = sample.reshape(-1, 3).std(axis=0)
+    # pack RGB into one 24-bit value so unique runs on a flat array, not row-wise
+    wide = sample.astype(np.uint32)
+    packed = (wide[:, 0] << 16) | (wide[:, 1] << 8) | wide[:, 2]
+    if np.unique(packed).size <= unique_color_threshold:
+        return True
+    stds = sample.std(axis=0)
     if np.all(stds <= tolerance):
         return True
     return False
 
 def extract_non_solid_frame(input_path, percent=0.1, output_path=None,
-                            image_format="png", max_attempts=7, step_seconds=0.5,
-                            tolerance=5, unique_color_threshold=10):
-    """Extract a non-solid frame near percent of duration. Returns saved image path."""
+                            image_format="jpg", max_attempts=7, step_seconds=0.5,
+                            tolerance=5, unique_color_threshold=10,
+                            max_size=None, return_bytes=False, container=None):
+    """Extract a non-solid frame near percent of duration. Returns saved image path.
+
+    With return_bytes=True nothing is written; returns (data, mime, width, height)
+    ready for embed_cover_bytes. max_size caps the longest side of the result.
+    An already-open container may be passed in; it is left open for the caller.
+    """
+    import av
+    import numpy as np
+
     src_path = Path(input_path).resolve()
     if not os.path.isfile(src_path):
         raise FileNotFoundError(f"Input not found: {src_path}")
     if not (0.0 <= percent <= 1.0):
         raise ValueError("percent must be between 0.0 and 1.0")
 
-    container = av.open(src_path)
+    owns_container = container is None
+    if owns_container:
+        container = open_video(src_path)
+    software = None
+    streams = []
     try:
         stream = next((s for s in container.streams if s.type == "video"), None)
         if stream is None:
@@ -122,83 +199,173 @@ def extract_non_solid_frame(input_path, percent=0.1, output_path=None,
             raise ValueError("Could not determine video duration; try ffprobe or provide timestamp.")
 
         target_time = duration_seconds * percent
+        time_base_seconds = float(stream.time_base)
 
-        # offsets: 0, -step, +step, -2*step, +2*step, ...
-        offsets = [0.0]
-        for i in range(1, max_attempts):
-            sign = -1 if i % 2 == 1 else 1
-            mult = (i + 1) // 2
-            offsets.append(sign * mult * step_seconds)
+        # sample points target, -step, +step, -2*step, ... clamped to the file and
+        # deduped in pts, so offsets that clamp to the same spot are sampled once
+        i = np.arange(max_attempts)
+        offsets = np.where(i % 2 == 1, -1, 1) * ((i + 1) // 2) * step_seconds
+        ts = np.clip(target_time + offsets, 0.0, duration_seconds - 1e-3)
+        sample_pts = np.unique(np.rint(ts / time_base_seconds).astype(np.int64))  # ascending
+        target_pts = int(round(target_time / time_base_seconds))
 
         output_name = f"{src_path.stem}"
         base = src_path.parent / output_name
-        first_attempt_path = None
-        saved_path = None
-
-        for i, off in enumerate(offsets[:max_attempts]):
-            ts = target_time + off
-            ts = max(0.0, min(ts, duration_seconds - 1e-3))
-            time_base_seconds = float(stream.time_base)
-            seek_ts = int(ts / time_base_seconds)
+        pct = int(percent * 100)
+
+        def attempt_path(attempt):
+            return output_path or f"{base}_{pct}pct_try{attempt+1}.{image_format}"
+
+        def finish(attempt, frame):
+            im = _downscale(frame.to_image(), max_size)
+            if return_bytes:
+                fmt = _format_for_extension(image_format)
+                return _encode_image(im, fmt), _mime_for_format(fmt), im.width, im.height
+            path = attempt_path(attempt)
+            im.save(path, **_save_kwargs(_format_for_extension(os.path.splitext(path)[1])))
+            return path
+
+        def start_decode(c):
+            """Seek c to the first sample; returns (first frame or None, rest of the decode)."""
+            st = next(s for s in c.streams if s.type == "video")
+            streams.append(st)
+            # let FFmpeg pick frame/slice threading with one thread per core
+            st.thread_type = "AUTO"
+            st.codec_context.thread_count = 0
+            # seeks land on keyframes and only keyframes are sampled, so the decoder
+            # can drop every non-key packet it is fed
+            st.codec_context.skip_frame = "NONKEY"
+
+            # one seek to the earliest sample, then decode forward through the rest,
+            # instead of a separate seek (and GOP decode) per attempt
             try:
-                container.seek(seek_ts, any_frame=False, stream=stream)
+                c.seek(int(sample_pts[0]), any_frame=False, stream=st)
             except Exception:
                 pass
 
-            for frame in container.decode(stream):
-                img = frame.to_image()
-                if output_path:
-                    out = output_path
-                else:
-                    pct = int(percent * 100)
-                    out = f"{base}_{pct}pct_try{i+1}.{image_format}"
-                img.save(out)
-                if first_attempt_path is None:
-                    first_attempt_path = out
-                
-                if not is_solid_color_image(img, tolerance=tolerance, unique_color_threshold=unique_color_threshold):
-                    saved_path = out
-                else:
-                    if out != first_attempt_path:
-                        try:
-                            os.remove(out)
-                        except Exception:
-                            pass
-                break
+            frames = c.decode(st)
+            return next(frames, None), frames
 
-            if saved_path:
+        try:
+            first, frames = start_decode(container)
+        except Exception:
+            # a hardware decoder can open fine and still fail on the first frame;
+            # redo the search on a software-only container
+            software = open_video(src_path, hwaccel=False)
+            first, frames = start_decode(software)
+
+        # frames arrive in pts order, but the preferred frame is the non-solid one
+        # nearest the target (as with the old target-first seek order), so keep the
+        # best so far and stop once every remaining sample can only be farther away
+        best = None      # (distance, attempt, frame) of the nearest non-solid frame
+        nearest = None   # same for any checked frame; used if all of them are solid
+        attempt = 0
+        k = 0
+        for frame in itertools.chain([first] if first is not None else [], frames):
+            pts = frame.pts
+            if attempt > 0:
+                # past the last sample, or a pts-less stream that cannot be placed
+                # in the window: stop instead of decoding on to EOF
+                if pts is None or pts > sample_pts[-1]:
+                    break
+                if pts < sample_pts[k]:
+                    continue
+            if pts is None:
+                pts = sample_pts[k]
+            distance = abs(int(pts) - target_pts)
+            if best is not None and distance >= best[0]:
                 break
 
-        if saved_path is None:
-            if first_attempt_path is None:
-                raise RuntimeError("No non-solid frame found within attempted timestamps.")
-            saved_path = first_attempt_path
+            # decide before encoding: only the chosen frame is ever written. The check
+            # runs on a 1/8-scale RGB conversion done by swscale, so rejected frames
+            # never get a full-resolution RGB copy.
+            small = frame.to_ndarray(width=max(1, frame.width // 8), height=max(1, frame.height // 8),
+                                     format="rgb24")
+            if nearest is None or distance < nearest[0]:
+                nearest = (distance, attempt, frame)
+            if not is_solid_color_image(small, tolerance=tolerance, unique_color_threshold=unique_color_threshold):
+                best = (distance, attempt, frame)
+                if pts >= target_pts:
+                    break
+
+            attempt += 1
+            # skip the samples this frame already covers; a keyframe from before the
+            # window (the usual first frame after the seek) covers none of them
+            while k < len(sample_pts) and sample_pts[k] <= pts:
+                k += 1
+            if attempt >= max_attempts or k == len(sample_pts):
+                break
 
-        return saved_path
+        chosen = best or nearest
+        if chosen is None:
+            raise RuntimeError("No non-solid frame found within attempted timestamps.")
+        return finish(chosen[1], chosen[2])
     finally:
-        container.close()
+        for st in streams:
+            st.codec_context.skip_frame = "DEFAULT"
+        if software is not None:
+            software.close()
+        if owns_container:
+            container.close()
 
 # -------------------------
 # Embed cover (M4A / Opus)
 # -------------------------
+def _format_for_extension(ext):
+    """PIL format name for a file extension ("jpg", ".png", ...)."""
+    from PIL import Image
+
+    ext = "." + ext.lstrip(".").lower()
+    return Image.registered_extensions().get(ext, ext[1:].upper())
+
+def _mime_for_format(fmt):
+    from PIL import Image
+
+    return Image.MIME.get(fmt.upper(), f"image/{fmt.lower()}")
+
+def _save_kwargs(fmt, quality=90):
+    if fmt.upper() in ("JPEG", "JPG"):
+        return {"format": "JPEG", "quality": quality, "optimize": True, "subsampling": 2}
+    return {"format": fmt}
+
+def _encode_image(im, fmt, quality=90):
+    buf = BytesIO()
+    im.save(buf, **_save_kwargs(fmt, quality))
+    return buf.getvalue()
+
+def _downscale(im, max_size):
+    """Return im shrunk so its longest side is at most max_size (unchanged if already small)."""
+    from PIL import Image
+
+    if max_size:
+        w, h = im.size
+        longest = max(w, h)
+        if longest > max_size:
+            scale = max_size / float(longest)
+            new_size = (int(w * scale), int(h * scale))
+            # bilinear is plenty for cover art; reducing_gap lets PIL box-reduce first
+            im = im.resize(new_size, Image.BILINEAR, reducing_gap=2.0)
+    return im
+
 def _read_and_optionally_resize(image_path, max_size=None, quality=90):
+    from PIL import Image
+
+    # Image.open only parses the header; pixels are decoded if a resize is needed
     with Image.open(image_path) as im:
         fmt = im.format or "JPEG"
-        mime = "image/jpeg" if fmt.upper() in ("JPEG", "JPG") else f"image/{fmt.lower()}"
-        if max_size:
-            w, h = im.size
-            longest = max(w, h)
-            if longest > max_size:
-                scale = max_size / float(longest)
-                new_size = (int(w * scale), int(h * scale))
-                im = im.resize(new_size, Image.LANCZOS)
-        buf = BytesIO()
-        save_kwargs = {"format": fmt}
-        if fmt.upper() in ("JPEG", "JPG"):
-            save_kwargs["quality"] = quality
-            save_kwargs["optimize"] = True
-        im.save(buf, **save_kwargs)
-        data = buf.getvalue()
+        mime = _mime_for_format(fmt)
+        width, height = im.size
+        if not max_size or max(width, height) <= max_size:
+            # nothing to resize: embed the file's own bytes rather than re-encoding them
+            with open(image_path, "rb") as f:
+                return f.read(), mime, width, height
+        if fmt == "JPEG":
+            # let libjpeg decode at 1/2, 1/4 or 1/8 scale (never below the target),
+            # so the final resize below starts from a much smaller image
+            scale = max_size / float(max(width, height))
+            im.draft(im.mode, (int(width * scale), int(height * scale)))
+        im = _downscale(im, max_size)
+        data = _encode_image(im, fmt, quality)
         width, height = im.size
     return data, mime, width, height
 
@@ -209,131 +376,215 @@ def embed_cover(audio_path, image_path, max_image_side=None, picture_type=3, des
     if not os.path.isfile(image_path):
         raise FileNotFoundError(f"Image file not found: {image_path}")
 
+    max_image_side = _cover_max_side(audio_path, max_image_side)
     data, mime, width, height = _read_and_optionally_resize(image_path, max_size=max_image_side)
-    ext = os.path.splitext(audio_path)[1].lower()
-    is_mp4 = ext in (".m4a", ".mp4", ".m4b", ".m4r")
-    is_opus = ext == ".opus"
-
-    if is_mp4:
-        mp4 = MP4(audio_path)
-        fmt = MP4Cover.FORMAT_JPEG if mime == "image/jpeg" else MP4Cover.FORMAT_PNG
-        cover = MP4Cover(data, imageformat=fmt)
-        mp4.tags["covr"] = [cover]
-        mp4.save()
-        return audio_path
-
-    if is_opus:
-        opus = OggOpus(audio_path)
-        pic = Picture()
-        pic.data = data
-        pic.type = picture_type
-        pic.mime = mime
-        pic.desc = description
-        pic.width = int(width)
-        pic.height = int(height)
-        pic.depth = 24
-        pic_data = pic.write()
-        b64 = base64.b64encode(pic_data).decode("ascii")
-        tags = opus.tags or {}
-        tags["metadata_block_picture"] = [b64]
-        opus.tags = tags
-        opus.save()
-        return audio_path
-
-    # fallback: try mutagen detection
-    from mutagen import File as MutagenFile
-    mf = MutagenFile(audio_path)
-    if isinstance(mf, MP4):
-        fmt = MP4Cover.FORMAT_JPEG if mime == "image/jpeg" else MP4Cover.FORMAT_PNG
-        cover = MP4Cover(data, imageformat=fmt)
-        mf.tags["covr"] = [cover]
-        mf.save()
-        return audio_path
-    if isinstance(mf, OggOpus):
-        pic = Picture()
-        pic.data = data
-        pic.type = picture_type
-        pic.mime = mime
-        pic.desc = description
-        pic.width = int(width)
-        pic.height = int(height)
-        pic.depth = 24
-        b64 = base64.b64encode(pic.write()).decode("ascii")
-        tags = mf.tags or {}
-        tags["metadata_block_picture"] = [b64]
-        mf.tags = tags
-        mf.save()
-        return audio_path
-
-    raise ValueError("Unsupported audio format. Only M4A/MP4 and Opus are supported.")
+    return embed_cover_bytes(audio_path, data, mime, width, height,
+                             picture_type=picture_type, description=description)
+
+def _embed_mp4(audio_path, data, mime, width, height, picture_type, description):
+    from mutagen.mp4 import MP4, MP4Cover
+
+    mp4 = MP4(audio_path)
+    fmt = MP4Cover.FORMAT_JPEG if mime == "image/jpeg" else MP4Cover.FORMAT_PNG
+    cover = MP4Cover(data, imageformat=fmt)
+    mp4.tags["covr"] = [cover]
+    # If the existing free space absorbs the cover, keep whatever is left so the moov is
+    # rewritten in place (mutagen's default would trim large padding and copy the file).
+    # If the file must grow anyway, reserve room for another cover this size.
+    mp4.save(padding=lambda info: info.padding if info.padding >= 0 else len(data) + 2048)
+
+def _embed_opus(audio_path, data, mime, width, height, picture_type, description):
+    from mutagen.oggopus import OggOpus
+    from mutagen.flac import Picture
+
+    opus = OggOpus(audio_path)
+    pic = Picture()
+    pic.data = data
+    pic.type = picture_type
+    pic.mime = mime
+    pic.desc = description
+    pic.width = int(width)
+    pic.height = int(height)
+    pic.depth = 24
+    pic_data = pic.write()
+    b64 = base64.b64encode(memoryview(pic_data)).decode("ascii")
+    tags = opus.tags or {}
+    tags["metadata_block_picture"] = [b64]
+    opus.tags = tags
+    opus.save()
+
+# audio extension (no dot, lower case) -> cover embedder
+_EMBEDDERS = {
+    "m4a": _embed_mp4, "mp4": _embed_mp4, "m4b": _embed_mp4, "m4r": _embed_mp4,
+    "opus": _embed_opus,
+}
+
+# Opus stores the cover base64-encoded in a comment; anything larger than this is wasted bytes
+OPUS_MAX_IMAGE_SIDE = 800
+
+def _embedder_for(audio_path):
+    return _EMBEDDERS.get(os.path.splitext(audio_path)[1].lstrip(".").lower())
+
+def _cover_max_side(audio_path, max_image_side):
+    """max_image_side, or OPUS_MAX_IMAGE_SIDE for Opus targets when none was given."""
+    if max_image_side is None and _embedder_for(audio_path) is _embed_opus:
+        return OPUS_MAX_IMAGE_SIDE
+    return max_image_side
+
+def embed_cover_bytes(audio_path, data, mime, width, height, picture_type=3, description="Cover (front)"):
+    """Embed already-encoded image bytes into audio_path (M4A/MP4 and .opus). Returns audio_path."""
+    if not os.path.isfile(audio_path):
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    handler = _embedder_for(audio_path)
+    if handler is None:
+        raise ValueError("Unsupported audio format. Only M4A/MP4 and Opus are supported.")
+    handler(audio_path, data, mime, width, height, picture_type, description)
+    return audio_path
 
 # -------------------------
 # Main CLI
 # -------------------------
 def is_video_with_audio(path):
-    """Return (has_video, has_audio)."""
+    """Return (has_video, has_audio, container).
+
+    container is the open input (the caller closes it), or None if path could not be opened.
+    """
     if not os.path.isfile(path):
-        return False, False
+        return False, False, None
     try:
-        c = av.open(path)
+        c = open_video(path)
     except Exception:
-        return False, False
-    try:
-        has_video = any(s.type == "video" for s in c.streams)
-        has_audio = any(s.type == "audio" for s in c.streams)
-        return has_video, has_audio
-    finally:
-        c.close()
+        return False, False, None
+    has_video = any(s.type == "video" for s in c.streams)
+    has_audio = any(s.type == "audio" for s in c.streams)
+    return has_video, has_audio, c
         
 def is_supported_for_embedding(audio_path):
-    ext = os.path.splitext(audio_path)[1].lower()
-    return ext in (".m4a", ".mp4", ".m4b", ".m4r", ".opus")
+    return _embedder_for(audio_path) is not None
+
+# -------------------------
+# Pipeline
+# -------------------------
+# extensions picked up when a directory is given on the command line
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".webm", ".mov", ".avi", ".m4v", ".flv", ".ts")
+
+def _process_one(path, max_side=None, verbose=False):
+    """Run extract-audio + cover-embed on one video. Returns (path, exit_code, message).
+
+    Never raises, so it is safe as a Pool worker; exit_code matches the CLI's codes.
+    """
+    log = print if verbose else (lambda *a: None)
+    if not os.path.isfile(path):
+        return path, 2, f"file not found: {path}"
+    try:
+        has_video, has_audio, container = is_video_with_audio(path)
+        try:
+            if not has_video:
+                return path, 3, "input does not contain a video stream."
+            if not has_audio:
+                return path, 4, "input does not contain an audio stream."
+
+            log("Extracting audio...")
+            audio_out = extract_audio_pure_python(path, container=container)
+            log("Audio saved to:", audio_out)
+
+            if not is_supported_for_embedding(audio_out):
+                return path, 0, f"audio saved to {audio_out} (no cover: unsupported format)"
+
+            log("Extracting non-solid frame at 10%...")
+            data, mime, width, height = extract_non_solid_frame(
+                path, percent=0.1, max_size=_cover_max_side(audio_out, max_side),
+                return_bytes=True, container=container)
+            log(f"Frame grabbed: {width}x{height} {mime}")
+
+            log("Embedding cover into audio...")
+            embed_cover_bytes(audio_out, data, mime, width, height)
+            return path, 0, f"cover embedded into {audio_out}"
+        finally:
+            if container is not None:
+                container.close()
+    except Exception:
+        import traceback
+        return path, 10, traceback.format_exc()
+
+def _expand_inputs(args):
+    """Files as given; directories expanded to the video files they contain."""
+    paths = []
+    for arg in args:
+        if os.path.isdir(arg):
+            paths.extend(sorted(str(p) for p in Path(arg).iterdir()
+                                if p.is_file() and p.suffix.lower() in VIDEO_EXTENSIONS))
+        else:
+            paths.append(arg)
+    return paths
+
+def main(paths, max_side=None, workers=None):
+    """Process each path in its own worker process. Returns the number of failures.
+
+    Nothing runs if two inputs would write the same outputs; every path counts as failed.
+    """
+    import multiprocessing
+
+    # outputs go next to the input as <stem>.<ext>, so clip.mp4 and clip.mkv would
+    # have two workers writing the same clip.m4a at once
+    bases = {}
+    for path in paths:
+        bases.setdefault(os.path.splitext(os.path.realpath(path))[0], []).append(path)
+    clashes = [group for group in bases.values() if len(group) > 1]
+    if clashes:
+        for group in clashes:
+            print(f"Error: {', '.join(group)} would write the same output files.")
+        return len(paths)
+
+    # spawn, not fork: an FFmpeg/PyAV state copied by fork() is unsafe (notably on macOS)
+    ctx = multiprocessing.get_context("spawn")
+    job = functools.partial(_process_one, max_side=max_side)
+    failures = 0
+    with ctx.Pool(workers or os.cpu_count()) as pool:
+        # each job is long, so hand them out one at a time
+        for path, code, message in pool.imap_unordered(job, paths, chunksize=1):
+            if code:
+                failures += 1
+                print(f"[FAIL {code}] {path}: {message}")
+            else:
+                print(f"[OK] {path}: {message}")
+    return failures
 
 if __name__ == "__main__":
-    import traceback
+    import multiprocessing
+
+    # in a frozen (PyInstaller) build, spawned pool workers re-enter here with
+    # --multiprocessing-fork arguments; this hands them to the worker loop instead
+    multiprocessing.freeze_support()
 
     if len(sys.argv) < 2:
-        print("Usage: python extract_audio.py <video_file> [--max-image-side N]")
+        print("Usage: python extract_audio.py <video_file|directory>... [--max-image-side N]")
         sys.exit(1)
 
-    video_in = sys.argv[1]
+    args = sys.argv[1:]
     max_image_side = None
-    if "--max-image-side" in sys.argv:
+    if "--max-image-side" in args:
+        idx = args.index("--max-image-side")
         try:
-            idx = sys.argv.index("--max-image-side")
-            max_image_side = int(sys.argv[idx + 1])
+            max_image_side = int(args[idx + 1])
         except Exception:
             max_image_side = None
-
-    try:
-        if not os.path.isfile(video_in):
-            print(f"Error: file not found: {video_in}")
-            sys.exit(2)
-
-        has_video, has_audio = is_video_with_audio(video_in)
-        if not has_video:
-            print("Error: input does not contain a video stream.")
-            sys.exit(3)
-        if not has_audio:
-            print("Error: input does not contain an audio stream.")
-            sys.exit(4)
-
-        print("Extracting audio...")
-        audio_out = extract_audio_pure_python(video_in)
-        print("Audio saved to:", audio_out)
-        
-        if is_supported_for_embedding(audio_out):
-            print("Extracting non-solid frame at 10%...")
-            image_out = extract_non_solid_frame(video_in, percent=0.1)
-            print("Image saved to:", image_out)
-            
-            print("Embedding cover into audio...")
-            embed_cover(audio_out, image_out, max_image_side=max_image_side)
-            print("Done. Cover embedded into:", audio_out)
-
-    except Exception as e:
-        print("An error occurred:")
-        traceback.print_exc()
-        sys.exit(10)
-
-
+        del args[idx:idx + 2]
+
+    if len(args) == 1 and not os.path.isdir(args[0]):
+        _, code, message = _process_one(args[0], max_image_side, verbose=True)
+        if code == 10:
+            print("An error occurred:")
+            print(message, end="")
+        elif code:
+            print("Error:", message)
+        else:
+            print("Done.", message[0].upper() + message[1:])
+        sys.exit(code)
+
+    paths = _expand_inputs(args)
+    if not paths:
+        print("Error: no video files found.")
+        sys.exit(2)
+    sys.exit(1 if main(paths, max_image_side) else 0)